@@ -2,13 +2,18 @@
 
 from google.adk.agents import Agent
 from google.genai import types
-from dotenv import load_dotenv
-from .functions import *
-load_dotenv()
-
-import requests
-import json
-from typing import Dict, Any, Optional
+# functions.py runs load_dotenv() on import.
+from .functions import (
+    acall_analyzer,
+    acall_dockerfile_gen,
+    acall_jenkinsfile_gen,
+    acall_get_creds,
+    acall_infra,
+    acall_get_environments,
+    acall_github_webhook_setup,
+    cache_lookup,
+    cache_invalidate,
+)
 
 
 root_agent = Agent(
@@ -16,15 +21,20 @@ root_agent = Agent(
     name="auto_anchor_agent",
     instruction="""You are the orchestrator of the below tools. A user is trying to solve a devops issue and needs your help to come up with a step by step plan. 
     Think of a strategy to solve his problem by making use of these tools in any order. The result of using all of these should solve the users problem.
+    Results of acall_get_creds and acall_get_environments are cached for a short time; acall_infra already refreshes the
+    cached creds. Only if something changed outside these tools (e.g. AWS resources or environment files edited by hand)
+    call cache_invalidate for the affected tool (e.g. 'get_creds') before fetching it again.
     """,
     tools=[
-    call_analyzer,
-    call_dockerfile_gen,
-    call_jenkinsfile_gen,
-    call_get_creds,
-    call_infra,
-    call_get_environments,
-    call_github_webhook_setup,
+    acall_analyzer,
+    acall_dockerfile_gen,
+    acall_jenkinsfile_gen,
+    acall_get_creds,
+    acall_infra,
+    acall_get_environments,
+    acall_github_webhook_setup,
+    cache_lookup,
+    cache_invalidate,
     ],
     generate_content_config=types.GenerateContentConfig(temperature=0.2),
 
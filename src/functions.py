@@ -6,9 +6,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BASE_URL='http://127.0.0.1:8084'
-import requests
-import json
-from typing import Dict, Any, Optional
+import asyncio
+import copy
+import os
+import time
+import httpx
+import orjson
+import urllib3
+from collections import OrderedDict
+from diskcache import Cache
+from functools import lru_cache
+from urllib.parse import urlencode
+from urllib3.exceptions import ConnectTimeoutError, ProtocolError
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 # Define the custom exception class if it's not already defined elsewhere
 class APIClientError(Exception):
@@ -18,76 +29,74 @@ class APIClientError(Exception):
         self.status_code = status_code
         self.response_data = response_data
 
-def handle_api_response(response: requests.Response) -> Dict[str, Any]:
+# Handlers for the non-'success' values of the application-level 'status' field of a
+# 2xx JSON response; handle_api_response returns 'success' replies before consulting them.
+
+def _on_error(data: Dict[str, Any], status_code: int) -> Dict[str, Any]:
+    error_message = data.get("error_message", "Unknown API error: 'status' is 'error' but 'error_message' is missing.")
+    raise APIClientError(error_message, status_code=status_code, response_data=data)
+
+def _on_missing_status(data: Dict[str, Any], status_code: int) -> Dict[str, Any]:
+    # 'status' field is missing. This could be an API endpoint that doesn't (yet)
+    # use the new status convention or implies success on 2xx.
+    # We'll check for an explicit "error_message" just in case.
+    # Also, we can check for the old {"success": False} pattern for backward compatibility if needed.
+    if "error_message" in data:
+        # If "error_message" is present even without status="error", treat it as an error.
+        raise APIClientError(data["error_message"], status_code=status_code, response_data=data)
+
+    # Optional: Check for old {"success": False} pattern if you need to support mixed APIs
+    # if data.get("success") is False:
+    #     old_error_message = data.get("error", data.get("message", "Unknown API error with success=False"))
+    #     raise APIClientError(old_error_message, status_code=status_code, response_data=data)
+
+    # If no explicit error indicators ('status':'error', 'error_message', or old 'success':False),
+    # and HTTP status was 2xx, assume it's a valid successful response.
+    return data
+
+def _on_unexpected_status(data: Dict[str, Any], status_code: int) -> Dict[str, Any]:
+    # 'status' field is present but has an unexpected value (e.g., "pending", "in_progress").
+    raise APIClientError(
+        f"API response has an unexpected 'status' field value: '{data.get('status')}'",
+        status_code=status_code,
+        response_data=data
+    )
+
+_STATUS_HANDLERS = {
+    "error": _on_error,
+    None: _on_missing_status,
+}
+
+def _format_fastapi_errors(detail: List[Any]) -> Any:
+    """
+    Formats FastAPI's validation error list (the 'detail' of a 422) into a readable string.
+    Lists that don't look like validation errors are returned unchanged.
+    """
+    first = detail[0]
+    if not (isinstance(first, dict) and 'loc' in first and 'msg' in first):
+        return detail
+    return "; ".join(f"{err.get('loc', ['unknown_field'])[-1]}: {err.get('msg', '')}" for err in detail)
+
+def handle_api_response(response: Union[urllib3.HTTPResponse, httpx.Response]) -> Dict[str, Any]:
     """
     Handles the response from the API, expecting a 'status':'success'/'error' convention.
+    Accepts either a urllib3 response (sync helpers) or an httpx response (async helpers).
 
     If 'status' is 'error', expects 'error_message' for details.
     If 'status' is 'success', returns the full JSON data.
     Raises APIClientError for HTTP errors or if the JSON response indicates an application-level error.
     """
-    try:
-        # First, check for HTTP-level errors (4xx or 5xx).
-        # This will raise requests.exceptions.HTTPError if the status code is an error.
-        response.raise_for_status()
+    if isinstance(response, httpx.Response):
+        status_code, body = response.status_code, response.content
+    else:
+        status_code, body = response.status, response.data
 
-        # If no HTTP error, then we expect a JSON response for 2xx status codes.
-        try:
-            data = response.json()
-        except json.JSONDecodeError as json_err:
-            # HTTP status was 2xx, but response body is not valid JSON.
-            raise APIClientError(
-                f"Failed to decode JSON response from successful HTTP call: {response.text}",
-                status_code=response.status_code
-            ) from json_err
-
-        # We have valid JSON and a 2xx HTTP status.
-        # Now, check the application-level 'status' field.
-        if isinstance(data, dict):
-            api_status = data.get("status")
-
-            if api_status == "error":
-                error_message = data.get("error_message", "Unknown API error: 'status' is 'error' but 'error_message' is missing.")
-                raise APIClientError(error_message, status_code=response.status_code, response_data=data)
-            elif api_status == "success":
-                # Valid success response as per the new format.
-                # The calling function will be responsible for extracting specific fields
-                # (e.g., the content of a "report" key, as in your example).
-                return data
-            elif api_status is None:
-                # 'status' field is missing. This could be an API endpoint that doesn't (yet)
-                # use the new status convention or implies success on 2xx.
-                # We'll check for an explicit "error_message" just in case.
-                # Also, we can check for the old {"success": False} pattern for backward compatibility if needed.
-                if "error_message" in data:
-                    # If "error_message" is present even without status="error", treat it as an error.
-                    raise APIClientError(data["error_message"], status_code=response.status_code, response_data=data)
-                
-                # Optional: Check for old {"success": False} pattern if you need to support mixed APIs
-                # if data.get("success") is False:
-                #     old_error_message = data.get("error", data.get("message", "Unknown API error with success=False"))
-                #     raise APIClientError(old_error_message, status_code=response.status_code, response_data=data)
-
-                # If no explicit error indicators ('status':'error', 'error_message', or old 'success':False),
-                # and HTTP status was 2xx, assume it's a valid successful response.
-                return data
-            else:
-                # 'status' field is present but has an unexpected value (e.g., "pending", "in_progress").
-                raise APIClientError(
-                    f"API response has an unexpected 'status' field value: '{api_status}'",
-                    status_code=response.status_code,
-                    response_data=data
-                )
-        else:
-            # Response JSON is not a dictionary (e.g., a list or a string directly).
-            # With a 2xx status, this is considered successful data.
-            return data
-
-    except requests.exceptions.HTTPError as http_err:
-        # This block handles 4xx or 5xx HTTP errors.
+    if status_code >= 400:
+        # 4xx or 5xx HTTP error. Dispatch on the status code directly rather than raising
+        # from raise_for_status() and catching it again; only error replies pay for this path.
         # Try to parse JSON from the error response body for a more specific message.
         try:
-            err_data = response.json()
+            err_data = orjson.loads(body)
             if isinstance(err_data, dict):
                 # Prefer the new "error_message" if the API provides it for HTTP errors
                 message = err_data.get("error_message")
@@ -95,26 +104,374 @@ def handle_api_response(response: requests.Response) -> Dict[str, Any]:
                     # Fallback to FastAPI's "detail" or other common fields
                     message = err_data.get("detail")
                     # Handle FastAPI's validation error format if 'detail' is a list of errors
-                    if isinstance(message, list) and len(message) > 0 and \
-                       isinstance(message[0], dict) and 'loc' in message[0] and 'msg' in message[0]:
-                        # Format FastAPI validation errors into a readable string
-                        message = "; ".join([f"{err.get('loc', ['unknown_field'])[-1]}: {err.get('msg', '')}" for err in message])
+                    if type(message) is list and message:
+                        message = _format_fastapi_errors(message)
                 
                 if message is None: # If still no specific message from known fields
                     message = str(err_data) # Use the string representation of the error data dict
                 
             else: # Error response JSON was not a dict (e.g. a list or string)
                 message = str(err_data) # Use its string representation
-        except json.JSONDecodeError:
-            # Error response body was not JSON. Use the raw response text.
-            message = f"HTTP error: {response.text}" if response.text else str(http_err)
+        except orjson.JSONDecodeError:
+            # Error response body was not JSON. Use the raw body, decoded once as UTF-8.
+            text = body.decode("utf-8", errors="replace")
+            message = f"HTTP error: {text}" if text else f"HTTP error: status code {status_code}"
         
-        raise APIClientError(message, status_code=response.status_code, response_data=getattr(http_err, 'response', {})) from http_err
+        raise APIClientError(message, status_code=status_code, response_data=response)
 
-    except requests.exceptions.RequestException as req_err:
-        # Handles network errors, DNS failures, timeouts, etc.
-        raise APIClientError(f"Request exception: {req_err}") from req_err
+    # No HTTP error, so we expect a JSON response.
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as json_err:
+        # HTTP status was 2xx, but response body is not valid JSON.
+        raise APIClientError(
+            f"Failed to decode JSON response from successful HTTP call: {body.decode('utf-8', errors='replace')}",
+            status_code=status_code
+        ) from json_err
+
+    # We have valid JSON and a 2xx HTTP status.
+    # Now, check the application-level 'status' field.
+    if isinstance(data, dict):
+        api_status = data.get("status")
+        if api_status == "success":
+            # Valid success response as per the new format, and by far the most common reply.
+            # The calling function will be responsible for extracting specific fields
+            # (e.g., the content of a "report" key, as in your example).
+            return data
+        handler = _STATUS_HANDLERS.get(api_status, _on_unexpected_status)
+        return handler(data, status_code)
+    else:
+        # Response JSON is not a dictionary (e.g., a list or a string directly).
+        # With a 2xx status, this is considered successful data.
+        return data
     
+# --- Endpoints ---
+# Paths relative to BASE_URL; both HTTP clients below are bound to that host.
+
+_EP_SAVE_KEYS = "/api/save-keys"
+_EP_GET_KEYS = "/api/get-keys"
+_EP_ANALYZER = "/analyzer"
+_EP_CREDS = "/creds"
+_EP_DOCKERFILE = "/dockerfile-gen"
+_EP_JENKINSFILE = "/jenkinsfile-gen"
+_EP_INFRA = "/infra"
+_EP_ENVIRONMENTS = "/get-environments"
+_EP_WEBHOOK = "/github-webhook-setup"
+_EP_CICD_PLAN = "/acube/cicdplan"
+_EP_DYNAMIC_QUESTION = "/acube/dynamicquestion"
+_EP_ANSWER_VALIDATOR = "/acube/answervalidator"
+_EP_DASHBOARD = "/dashboard-file-data"
+_EP_EDIT_FILE = "/edit-file"
+_EP_INSTANCE_IP = "/get-instance-ip"
+_EP_BATCH = "/api/batch"
+
+# --- HTTP Clients ---
+
+# (connect, read) timeout applied to every call unless overridden.
+DEFAULT_TIMEOUT = (3.05, 30)
+
+# Endpoints that run Terraform, server-side LLM calls or GitHub setup can legitimately take
+# minutes. Timing out client-side would leave the server working while the agent re-issues the call,
+# so only the connect phase is bounded for them.
+_LONG_TIMEOUT = urllib3.Timeout(connect=DEFAULT_TIMEOUT[0], read=None)
+_ALONG_TIMEOUT = httpx.Timeout(None, connect=DEFAULT_TIMEOUT[0])
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Transient failures are retried here with jittered backoff, which is far cheaper than surfacing
+# them and having the LLM re-issue the tool call; the async helpers apply the same policies via
+# _arequest. By default only failed connects are retried: most endpoints have side effects
+# (generating files, saving keys, GitHub setup), even behind a GET, and a read error or 5xx
+# doesn't tell us whether the server already acted on the request.
+# raise_on_status=False hands the final 5xx to handle_api_response instead of a MaxRetryError.
+_RETRY = Retry(
+    total=3,
+    read=0,
+    status=0,
+    other=0,
+    backoff_factor=0.2,
+    backoff_jitter=0.1,
+    raise_on_status=False,
+)
+
+# Read-only GETs (creds, environments, dashboard, instance IP, keys) are safe to repeat, so they
+# also retry read errors and proxy 5xx, honouring Retry-After.
+_IDEMPOTENT_RETRY = Retry(
+    total=3,
+    backoff_factor=0.2,
+    backoff_jitter=0.1,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+# call_infra/acall_infra get a longer window for the API server to come up (refused connections);
+# like the default, this never repeats a request the server already received, which would re-run
+# provisioning.
+_INFRA_RETRY = _RETRY.new(total=None, connect=6, backoff_factor=0.5)
+
+# One shared connection pool for BASE_URL, so consecutive tool calls reuse keep-alive sockets.
+# Talking to urllib3 directly also skips the requests layer (session merging, hooks, cookie
+# jar) the helpers don't use. The pool connects lazily on the first request.
+_POOL = urllib3.connection_from_url(
+    BASE_URL,
+    maxsize=16,
+    block=False,
+    timeout=urllib3.Timeout(connect=DEFAULT_TIMEOUT[0], read=DEFAULT_TIMEOUT[1]),
+    retries=_RETRY,
+)
+
+# Query params as (name, value) pairs. Each helper builds its own in a fixed order straight
+# from its signature, so there is no params dict to allocate or sort per call. A None value
+# (e.g. an argument the LLM passed as null) means "omit", as with the old params dicts.
+_Query = Tuple[Tuple[str, Optional[str]], ...]
+
+@lru_cache(maxsize=1024)
+def _encode_params(query: _Query) -> str:
+    # Memoized: the agent re-sends the same work_dir/folder_path arguments over and over,
+    # so the None filter only runs once per distinct query.
+    return urlencode([(k, v) for k, v in query if v is not None])
+
+def _with_query(endpoint: str, query: _Query) -> str:
+    """Appends the pre-encoded query string to endpoint."""
+    encoded = _encode_params(query) if query else ""
+    return f"{endpoint}?{encoded}" if encoded else endpoint
+
+def _get(endpoint: str, query: _Query = (), retries: Optional[Retry] = None,
+         timeout: Optional[urllib3.Timeout] = None) -> urllib3.HTTPResponse:
+    """Sends a GET through the shared connection pool with the default timeout and retry policy unless given."""
+    try:
+        return _POOL.request("GET", _with_query(endpoint, query), retries=retries, timeout=timeout or _POOL.timeout)
+    except urllib3.exceptions.HTTPError as req_err:
+        # Handles network errors, timeouts, exhausted retries, etc.
+        raise APIClientError(f"Request exception: {req_err}") from req_err
+
+def _post(endpoint: str, payload: Dict[str, Any], timeout: Optional[urllib3.Timeout] = None) -> urllib3.HTTPResponse:
+    """Sends a JSON POST through the shared connection pool with the default timeout unless given."""
+    try:
+        # orjson produces the UTF-8 body directly.
+        return _POOL.request("POST", endpoint, body=orjson.dumps(payload), headers=_JSON_HEADERS,
+                             timeout=timeout or _POOL.timeout)
+    except urllib3.exceptions.HTTPError as req_err:
+        raise APIClientError(f"Request exception: {req_err}") from req_err
+
+# Async clients for the acall_* helpers, so independent tool calls can be awaited
+# concurrently (e.g. with asyncio.gather) instead of blocking one after another.
+# An httpx.AsyncClient's pooled connections belong to the event loop that opened them, and hosts
+# such as ADK's sync Runner.run start a fresh loop per invocation, so there is one client per loop,
+# created on first use and closed when its loop shuts down.
+# Set AUTO_ANCHOR_API_UDS if the API server also listens on a Unix domain socket.
+_API_UDS = os.getenv("AUTO_ANCHOR_API_UDS")
+# Loop -> (client, the task that closes it at shutdown). The pooled connections reference their
+# loop, so entries have to be removed explicitly; a weak-keyed dict would never release them.
+_ACLIENTS: "Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Task]]" = {}
+
+async def _aclose_at_shutdown(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    # asyncio.run cancels the tasks still pending before it closes the loop, which lands here
+    # while the loop can still run the client's graceful close.
+    try:
+        await loop.create_future()
+    except asyncio.CancelledError:
+        _ACLIENTS.pop(loop, None)
+        await client.aclose()
+        raise
+
+def _aclient() -> httpx.AsyncClient:
+    """Returns the shared async client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    entry = _ACLIENTS.get(loop)
+    if entry is None:
+        # Loops closed without cancelling their tasks (hosts driving the loop by hand) never reached
+        # _aclose_at_shutdown, and asyncio logs the closer as destroyed while pending. Their sockets
+        # can't be closed through a dead loop anymore; dropping the client lets GC do it.
+        for old in [old for old in _ACLIENTS if old.is_closed()]:
+            del _ACLIENTS[old]
+        client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            transport=httpx.AsyncHTTPTransport(
+                # Multiplexes concurrent tool calls over one connection when the server (or a proxy in
+                # front of it) speaks HTTP/2 over TLS; plain-http servers keep using HTTP/1.1 keep-alive.
+                http2=True,
+                uds=_API_UDS,
+                # Bind to loopback when the API server is local.
+                local_address="127.0.0.1" if httpx.URL(BASE_URL).host == "127.0.0.1" else None,
+                # No transport-level retries: _arequest applies the same policies as the sync pool.
+            ),
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+        )
+        entry = _ACLIENTS[loop] = (client, loop.create_task(_aclose_at_shutdown(loop, client)))
+    return entry[0]
+
+async def _arequest(method: str, url: str, retries: Retry, **kwargs: Any) -> httpx.Response:
+    """
+    Sends a request on the loop's client, retrying under a urllib3 Retry policy the way the sync pool
+    does: the policy keeps the counters and backoff, only the sleeping is done here, without blocking.
+    Like raise_on_status=False, the last retryable response is returned rather than raised.
+    """
+    while True:
+        try:
+            response = await _aclient().request(method, url, **kwargs)
+        except httpx.TransportError as req_err:
+            # Retry tells connect failures (request never sent) from read failures by urllib3 exception type.
+            error = (ConnectTimeoutError if isinstance(req_err, (httpx.ConnectError, httpx.ConnectTimeout))
+                     else ProtocolError)(str(req_err))
+            try:
+                retries = retries.increment(method, url, error=error)
+            except urllib3.exceptions.HTTPError:
+                raise req_err from None
+            await asyncio.sleep(retries.get_backoff_time())
+            continue
+        if not retries.is_retry(method, response.status_code, "Retry-After" in response.headers):
+            return response
+        final = urllib3.HTTPResponse(status=response.status_code, headers=dict(response.headers))
+        try:
+            retries = retries.increment(method, url, response=final)
+        except urllib3.exceptions.MaxRetryError:
+            return response
+        await response.aclose()
+        retry_after = retries.get_retry_after(final) if retries.respect_retry_after_header else None
+        await asyncio.sleep(retry_after or retries.get_backoff_time())
+
+async def _aget(endpoint: str, query: _Query = (), retries: Optional[Retry] = None,
+                timeout: Any = httpx.USE_CLIENT_DEFAULT) -> httpx.Response:
+    """Async counterpart of :func:`_get`, with the same default retry policy."""
+    try:
+        return await _arequest("GET", _with_query(endpoint, query), retries or _RETRY, timeout=timeout)
+    except (httpx.HTTPError, RuntimeError) as req_err:
+        # RuntimeError covers transport failures tied to a closed event loop.
+        raise APIClientError(f"Request exception: {req_err}") from req_err
+
+async def _apost(endpoint: str, payload: Dict[str, Any]) -> httpx.Response:
+    """Async counterpart of :func:`_post`."""
+    try:
+        return await _arequest("POST", endpoint, _RETRY, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+    except (httpx.HTTPError, RuntimeError) as req_err:
+        raise APIClientError(f"Request exception: {req_err}") from req_err
+
+# --- Response Cache ---
+
+# In-process LRU/TTL cache for idempotent GETs the agent tends to re-issue with identical
+# arguments. Keys are (endpoint, query); values are (stored_at, data).
+_CACHE_MAXSIZE = 256
+_CACHE: "OrderedDict[Tuple[str, _Query], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# Per-endpoint freshness, shared by the helpers and the cache tools below.
+_TTL_CREDS = 60
+_TTL_ENVIRONMENTS = 60
+_TTL_DASHBOARD = 10
+_TTL_INSTANCE_IP = 5
+
+# Cached endpoints whose data a call to the key endpoint changes, for calls made through
+# call_batch (the standalone helpers invalidate inline).
+_BATCH_INVALIDATES = {
+    _EP_SAVE_KEYS: (_EP_CREDS,),
+    _EP_DOCKERFILE: (_EP_DASHBOARD,),
+    _EP_JENKINSFILE: (_EP_DASHBOARD,),
+    _EP_EDIT_FILE: (_EP_DASHBOARD,),
+    _EP_INFRA: (_EP_CREDS, _EP_INSTANCE_IP),
+}
+
+# Disk-backed second tier for responses worth keeping across agent restarts. Values are
+# (wall-clock stored_at, data), so a restarted agent still honours the endpoint's ttl;
+# _PERSIST_TTL only bounds how long diskcache keeps them around. Entries are tagged with
+# their endpoint so _cache_invalidate can drop them the same way. Values are
+# pickled in plain text, so only non-secret endpoints are persisted (never creds), the
+# directory is private to the user, and it is only opened once something is persisted.
+_PERSIST_TTL = 300
+_PERSISTED_ENDPOINTS = frozenset({_EP_ENVIRONMENTS})
+_DCACHE_DIR = os.path.expanduser(os.getenv("AUTO_ANCHOR_CACHE_DIR", "~/.auto_anchor/cache"))
+# None until first use; False once opening it failed, so the process stays memory-only
+# instead of retrying the filesystem calls on every persisted lookup.
+_DCACHE: Union[Cache, None, bool] = None
+
+def _dcache() -> Optional[Cache]:
+    """Opens the disk cache on first use. Returns None if the directory can't be used."""
+    global _DCACHE
+    if _DCACHE is None:
+        try:
+            os.makedirs(_DCACHE_DIR, mode=0o700, exist_ok=True)
+            # makedirs leaves an existing directory's mode alone.
+            os.chmod(_DCACHE_DIR, 0o700)
+            _DCACHE = Cache(_DCACHE_DIR, size_limit=int(1e8), tag_index=True)
+        except OSError:
+            _DCACHE = False
+            return None
+        # Older versions persisted creds here; don't leave them lying around.
+        _DCACHE.evict(_EP_CREDS)
+    return _DCACHE if _DCACHE is not False else None
+
+def _cache_lookup(key: Tuple[str, _Query], ttl: float, persist: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Returns a copy of the cached data for key if it is younger than ttl seconds, else None.
+    With persist, a key that isn't in memory at all (e.g. after a restart) falls back to the disk cache.
+    """
+    entry = _CACHE.get(key)
+    if entry is not None:
+        if time.monotonic() - entry[0] >= ttl:
+            return None
+        _CACHE.move_to_end(key)
+        # Copies keep callers from mutating the cached dict.
+        return copy.deepcopy(entry[1])
+    dcache = _dcache() if persist else None
+    if dcache is not None:
+        entry = dcache.get(key)
+        # Anything else was written in an older format.
+        if isinstance(entry, tuple):
+            age = time.time() - entry[0]
+            if 0 <= age < ttl:
+                # Promoted with its real age, so it expires in memory when it would have on disk.
+                _cache_store(key, entry[1], age=age)
+                # Unpickling already yields a fresh copy.
+                return entry[1]
+    return None
+
+def _cache_store(key: Tuple[str, _Query], data: Dict[str, Any], persist: bool = False, age: float = 0) -> None:
+    _CACHE[key] = (time.monotonic() - age, copy.deepcopy(data))
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > _CACHE_MAXSIZE:
+        _CACHE.popitem(last=False)
+    dcache = _dcache() if persist else None
+    if dcache is not None:
+        dcache.set(key, (time.time(), data), expire=_PERSIST_TTL, tag=key[0])
+
+def _cache_invalidate(*endpoints: str) -> None:
+    """Drops every cached entry for the given endpoints, whatever their query, from both tiers."""
+    for key in [key for key in _CACHE if key[0] in endpoints]:
+        del _CACHE[key]
+    persisted = _PERSISTED_ENDPOINTS.intersection(endpoints)
+    dcache = _dcache() if persisted else None
+    if dcache is not None:
+        for endpoint in persisted:
+            dcache.evict(endpoint)
+
+def _cached_get(endpoint: str, query: _Query = (), ttl: float = 0, persist: bool = False) -> Dict[str, Any]:
+    """
+    GETs endpoint and handles the response, serving from the cache for up to ttl seconds (0 disables).
+    With persist, responses are also kept on disk for _PERSIST_TTL seconds across restarts.
+    Only for read-only endpoints, since failed requests are retried with _IDEMPOTENT_RETRY.
+    """
+    if ttl <= 0:
+        return handle_api_response(_get(endpoint, query, retries=_IDEMPOTENT_RETRY))
+    key = (endpoint, query)
+    data = _cache_lookup(key, ttl, persist)
+    if data is None:
+        data = handle_api_response(_get(endpoint, query, retries=_IDEMPOTENT_RETRY))
+        _cache_store(key, data, persist)
+    return data
+
+async def _acached_get(endpoint: str, query: _Query = (), ttl: float = 0, persist: bool = False) -> Dict[str, Any]:
+    """Async counterpart of :func:`_cached_get`, sharing the same cache."""
+    if ttl <= 0:
+        return handle_api_response(await _aget(endpoint, query, retries=_IDEMPOTENT_RETRY))
+    key = (endpoint, query)
+    data = _cache_lookup(key, ttl, persist)
+    if data is None:
+        data = handle_api_response(await _aget(endpoint, query, retries=_IDEMPOTENT_RETRY))
+        _cache_store(key, data, persist)
+    return data
+
 # --- Client Functions ---
 
 def call_save_keys(public_key: str, private_key: str) -> Dict[str, Any]:
@@ -133,9 +490,8 @@ def call_save_keys(public_key: str, private_key: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/api/save-keys"
-    payload = {"public_key": public_key, "private_key": private_key}
-    response = requests.post(endpoint, json=payload)
+    response = _post(_EP_SAVE_KEYS, {"public_key": public_key, "private_key": private_key})
+    _cache_invalidate(_EP_CREDS)
     return handle_api_response(response)
 
 def call_get_keys() -> Dict[str, Any]:
@@ -151,9 +507,7 @@ def call_get_keys() -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/api/get-keys"
-    response = requests.get(endpoint)
-    return handle_api_response(response)
+    return handle_api_response(_get(_EP_GET_KEYS, retries=_IDEMPOTENT_RETRY))
 
 def call_analyzer(folder_path: str, environment_path: str) -> Dict[str, Any]:
     """
@@ -175,15 +529,8 @@ def call_analyzer(folder_path: str, environment_path: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/analyzer"
-    payload = {}
-    if folder_path is not None:
-        payload["folder_path"] = folder_path
-    if environment_path is not None:
-        payload["environment_path"] = environment_path
-
-    response = requests.post(endpoint, json=payload)
-    return handle_api_response(response)
+    payload = {k: v for k, v in (("folder_path", folder_path), ("environment_path", environment_path)) if v is not None}
+    return handle_api_response(_post(_EP_ANALYZER, payload))
 
 def call_get_creds() -> Dict[str, Any]:
     """
@@ -198,9 +545,7 @@ def call_get_creds() -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/creds"
-    response = requests.get(endpoint)
-    return handle_api_response(response)
+    return _cached_get(_EP_CREDS, ttl=_TTL_CREDS)
 
 def call_dockerfile_gen(app_type: str, python_version: str, work_dir: str, entrypoint: str, folder_path: str) -> Dict[str, Any]:
     """
@@ -221,15 +566,14 @@ def call_dockerfile_gen(app_type: str, python_version: str, work_dir: str, entry
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/dockerfile-gen"
-    params = {
-        "app_type": app_type,
-        "python_version": python_version,
-        "work_dir": work_dir,
-        "entrypoint": entrypoint,
-        "folder_path": folder_path
-    }
-    response = requests.get(endpoint, params=params)
+    response = _get(_EP_DOCKERFILE, (
+        ("app_type", app_type),
+        ("python_version", python_version),
+        ("work_dir", work_dir),
+        ("entrypoint", entrypoint),
+        ("folder_path", folder_path),
+    ))
+    _cache_invalidate(_EP_DASHBOARD)
     return handle_api_response(response)
 
 def call_jenkinsfile_gen(folder_path: str, app_name: Optional[str] = None, port: Optional[str] = None, version: Optional[str] = None) -> Dict[str, Any]:
@@ -251,13 +595,9 @@ def call_jenkinsfile_gen(folder_path: str, app_name: Optional[str] = None, port:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/jenkinsfile-gen"
-    params: Dict[str, Any] = {"folder_path": folder_path}
-    if app_name: params["app_name"] = app_name
-    if port: params["port"] = port
-    if version: params["version"] = version
-
-    response = requests.get(endpoint, params=params)
+    query = (("folder_path", folder_path),) + tuple((k, v) for k, v in (("app_name", app_name), ("port", port), ("version", version)) if v)
+    response = _get(_EP_JENKINSFILE, query)
+    _cache_invalidate(_EP_DASHBOARD)
     return handle_api_response(response)
 
 def call_infra(work_dir: str, instance_size: str) -> Dict[str, Any]:
@@ -277,9 +617,9 @@ def call_infra(work_dir: str, instance_size: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/infra"
-    params = {"work_dir": work_dir, "instance_size": instance_size}
-    response = requests.get(endpoint, params=params)
+    response = _get(_EP_INFRA, (("work_dir", work_dir), ("instance_size", instance_size)), retries=_INFRA_RETRY, timeout=_LONG_TIMEOUT)
+    # Provisioning can change the instance IP and the VPC/security-group listing.
+    _cache_invalidate(_EP_CREDS, _EP_INSTANCE_IP)
     return handle_api_response(response)
 
 def call_get_environments(folder_path: str) -> Dict[str, Any]:
@@ -298,10 +638,7 @@ def call_get_environments(folder_path: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/get-environments"
-    params = {"folder_path": folder_path}
-    response = requests.get(endpoint, params=params)
-    return handle_api_response(response)
+    return _cached_get(_EP_ENVIRONMENTS, (("folder_path", folder_path),), ttl=_TTL_ENVIRONMENTS, persist=True)
 
 def call_github_webhook_setup(folder_path: str) -> Dict[str, Any]:
     """
@@ -320,10 +657,7 @@ def call_github_webhook_setup(folder_path: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/github-webhook-setup"
-    params = {"folder_path": folder_path}
-    response = requests.get(endpoint, params=params)
-    return handle_api_response(response)
+    return handle_api_response(_get(_EP_WEBHOOK, (("folder_path", folder_path),), timeout=_LONG_TIMEOUT))
 
 # --- Acube Endpoints ---
 def call_acube_cicd_plan(user_request: str, service_type: str) -> Dict[str, Any]:
@@ -344,10 +678,7 @@ def call_acube_cicd_plan(user_request: str, service_type: str) -> Dict[str, Any]
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/acube/cicdplan"
-    params = {"user_request": user_request, "service_type": service_type}
-    response = requests.get(endpoint, params=params)
-    return handle_api_response(response)
+    return handle_api_response(_get(_EP_CICD_PLAN, (("user_request", user_request), ("service_type", service_type)), timeout=_LONG_TIMEOUT))
 
 def call_acube_dynamic_question(tool_name: str) -> Dict[str, Any]:
     """
@@ -365,10 +696,7 @@ def call_acube_dynamic_question(tool_name: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/acube/dynamicquestion"
-    params = {"tool_name": tool_name}
-    response = requests.get(endpoint, params=params)
-    return handle_api_response(response)
+    return handle_api_response(_get(_EP_DYNAMIC_QUESTION, (("tool_name", tool_name),)))
 
 def call_acube_answer_validator(tool_name: str, answer: str) -> Dict[str, Any]:
     """
@@ -387,10 +715,7 @@ def call_acube_answer_validator(tool_name: str, answer: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/acube/answervalidator"
-    params = {"tool_name": tool_name, "answer": answer}
-    response = requests.get(endpoint, params=params)
-    return handle_api_response(response)
+    return handle_api_response(_get(_EP_ANSWER_VALIDATOR, (("tool_name", tool_name), ("answer", answer)), timeout=_LONG_TIMEOUT))
 
 # --- Other Endpoints ---
 def call_dashboard_file_data() -> Dict[str, Any]:
@@ -407,9 +732,8 @@ def call_dashboard_file_data() -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/dashboard-file-data"
-    response = requests.get(endpoint)
-    return handle_api_response(response)
+    # Short TTL; the generators and call_edit_file also invalidate it when they write files.
+    return _cached_get(_EP_DASHBOARD, ttl=_TTL_DASHBOARD)
 
 def call_edit_file(filename: str, original_code: str, prompt: str) -> Dict[str, Any]:
     """
@@ -429,9 +753,8 @@ def call_edit_file(filename: str, original_code: str, prompt: str) -> Dict[str,
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/edit-file"
-    payload = {"filename": filename, "original_code": original_code, "prompt": prompt}
-    response = requests.post(endpoint, json=payload)
+    response = _post(_EP_EDIT_FILE, {"filename": filename, "original_code": original_code, "prompt": prompt}, timeout=_LONG_TIMEOUT)
+    _cache_invalidate(_EP_DASHBOARD)
     return handle_api_response(response)
 
 def call_get_instance_ip(work_dir: str) -> Dict[str, Any]:
@@ -451,11 +774,171 @@ def call_get_instance_ip(work_dir: str) -> Dict[str, Any]:
     Raises:
         APIClientError: If the API call fails or returns an error.
     """
-    endpoint = f"{BASE_URL}/get-instance-ip"
-    params = {"work_dir": work_dir}
-    response = requests.get(endpoint, params=params)
+    return _cached_get(_EP_INSTANCE_IP, (("work_dir", work_dir),), ttl=_TTL_INSTANCE_IP)
+
+def call_batch(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sends several API calls to the server in a single HTTP round trip.
+    Requires the server to expose the `/api/batch` endpoint.
+
+    Args:
+        calls (List[dict]): The calls to make, in order. Each item is
+                            `{"endpoint": "/analyzer", "method": "POST", "payload": {...}}`, where
+                            `payload` is the JSON body for POST and the query params for GET.
+
+    Returns:
+        list: One API response per call, in the same order as `calls`.
+              Expected server reply: `{"responses": [{"status_code": 200, "body": {...}}, ...]}`
+
+    Raises:
+        APIClientError: If the batch request fails or any of the calls returns an error.
+    """
+    response = _post(_EP_BATCH, {"calls": calls}, timeout=_LONG_TIMEOUT)
+    # Batched calls may change server state (file generation, infra); drop what they affect.
+    _cache_invalidate(*{
+        endpoint
+        for call in calls
+        for endpoint in (call.get("endpoint"), *_BATCH_INVALIDATES.get(call.get("endpoint"), ()))
+        if endpoint
+    })
+    batch = handle_api_response(response)
+
+    items = batch.get("responses") if isinstance(batch, dict) else None
+    if not isinstance(items, list) or len(items) != len(calls) or \
+       not all(isinstance(item, dict) and isinstance(item.get("status_code"), int) for item in items):
+        raise APIClientError(
+            "Malformed batch response: expected one {'status_code', 'body'} item per call in 'responses'.",
+            status_code=response.status,
+            response_data=batch
+        )
+    # Run every item through the same checks as a standalone reply.
+    return [
+        handle_api_response(httpx.Response(item["status_code"], content=orjson.dumps(item.get("body"))))
+        for item in items
+    ]
+
+# --- Cache Tools ---
+# Let the agent peek at the response cache and bust it when state changed behind the tools' back
+# (the helpers already invalidate after their own writes). Tool name -> (endpoint, query param names, ttl, persist).
+_CACHED_TOOLS = {
+    "get_creds": (_EP_CREDS, (), _TTL_CREDS, False),
+    "get_environments": (_EP_ENVIRONMENTS, ("folder_path",), _TTL_ENVIRONMENTS, True),
+    "dashboard_file_data": (_EP_DASHBOARD, (), _TTL_DASHBOARD, False),
+    "get_instance_ip": (_EP_INSTANCE_IP, ("work_dir",), _TTL_INSTANCE_IP, False),
+}
+
+def _cached_tool(tool_name: str) -> Optional[Tuple[str, Tuple[str, ...], float, bool]]:
+    # Accept the registered function names too (e.g. "acall_get_creds").
+    return _CACHED_TOOLS.get(tool_name.removeprefix("acall_").removeprefix("call_"))
+
+def cache_lookup(tool_name: str, args_json: str) -> Dict[str, Any]:
+    """
+    Looks up a still-fresh cached result of a previous tool call without contacting the server.
+    The tools themselves already serve cached results, so this is only needed to check what is cached.
+
+    Args:
+        tool_name (str): The cached tool, one of "get_creds", "get_environments",
+                         "dashboard_file_data" or "get_instance_ip".
+        args_json (str): The tool's arguments as a JSON object, e.g. '{}' for get_creds or
+                         '{"folder_path": "/path/to/project"}' for get_environments.
+
+    Returns:
+        dict: Example hit: `{"status": "success", "cached": True, "result": {...}}`
+              Example miss: `{"status": "success", "cached": False}` (call the tool itself)
+              Example error: `{"status": "error", "error_message": "Tool 'X' is not cached."}`
+    """
+    policy = _cached_tool(tool_name)
+    if policy is None:
+        return {"status": "error", "error_message": f"Tool '{tool_name}' is not cached."}
+    endpoint, param_names, ttl, persist = policy
+    try:
+        args = orjson.loads(args_json or "{}")
+        query = tuple((name, args[name]) for name in param_names)
+        # Must match the str-valued queries the tools build (and be hashable for the cache key).
+        for name, value in query:
+            if not isinstance(value, str):
+                raise TypeError(f"'{name}' must be a string, got {type(value).__name__}")
+    except (orjson.JSONDecodeError, TypeError, KeyError) as err:
+        return {"status": "error", "error_message": f"Invalid args_json for '{tool_name}': {err!r}"}
+    data = _cache_lookup((endpoint, query), ttl, persist)
+    if data is None:
+        return {"status": "success", "cached": False}
+    return {"status": "success", "cached": True, "result": data}
+
+def cache_invalidate(tool_name: str) -> Dict[str, Any]:
+    """
+    Discards every cached result of a tool, whatever its arguments, so the next call fetches fresh data.
+    Only needed when state changed outside these tools, e.g. AWS resources edited by hand;
+    the tools already invalidate what their own calls change.
+
+    Args:
+        tool_name (str): The cached tool, one of "get_creds", "get_environments",
+                         "dashboard_file_data" or "get_instance_ip".
+
+    Returns:
+        dict: Example success: `{"status": "success", "message": "Cache cleared for 'get_creds'."}`
+              Example error: `{"status": "error", "error_message": "Tool 'X' is not cached."}`
+    """
+    policy = _cached_tool(tool_name)
+    if policy is None:
+        return {"status": "error", "error_message": f"Tool '{tool_name}' is not cached."}
+    _cache_invalidate(policy[0])
+    return {"status": "success", "message": f"Cache cleared for '{tool_name}'."}
+
+# --- Async Client Functions ---
+# Non-blocking variants of the tools the agent orchestrates; these are what the agent registers,
+# so ADK can run independent tool calls concurrently. They hit the same endpoints and return
+# the same data as their call_* counterparts.
+
+def _doc_from(sync_fn):
+    """Copies sync_fn's docstring onto the decorated async variant (ADK uses it as the tool description)."""
+    def decorate(async_fn):
+        async_fn.__doc__ = sync_fn.__doc__
+        return async_fn
+    return decorate
+
+@_doc_from(call_analyzer)
+async def acall_analyzer(folder_path: str, environment_path: str) -> Dict[str, Any]:
+    payload = {k: v for k, v in (("folder_path", folder_path), ("environment_path", environment_path)) if v is not None}
+    return handle_api_response(await _apost(_EP_ANALYZER, payload))
+
+@_doc_from(call_get_creds)
+async def acall_get_creds() -> Dict[str, Any]:
+    return await _acached_get(_EP_CREDS, ttl=_TTL_CREDS)
+
+@_doc_from(call_dockerfile_gen)
+async def acall_dockerfile_gen(app_type: str, python_version: str, work_dir: str, entrypoint: str, folder_path: str) -> Dict[str, Any]:
+    response = await _aget(_EP_DOCKERFILE, (
+        ("app_type", app_type),
+        ("python_version", python_version),
+        ("work_dir", work_dir),
+        ("entrypoint", entrypoint),
+        ("folder_path", folder_path),
+    ))
+    _cache_invalidate(_EP_DASHBOARD)
+    return handle_api_response(response)
+
+@_doc_from(call_jenkinsfile_gen)
+async def acall_jenkinsfile_gen(folder_path: str, app_name: Optional[str] = None, port: Optional[str] = None, version: Optional[str] = None) -> Dict[str, Any]:
+    query = (("folder_path", folder_path),) + tuple((k, v) for k, v in (("app_name", app_name), ("port", port), ("version", version)) if v)
+    response = await _aget(_EP_JENKINSFILE, query)
+    _cache_invalidate(_EP_DASHBOARD)
     return handle_api_response(response)
 
+@_doc_from(call_infra)
+async def acall_infra(work_dir: str, instance_size: str) -> Dict[str, Any]:
+    response = await _aget(_EP_INFRA, (("work_dir", work_dir), ("instance_size", instance_size)), retries=_INFRA_RETRY, timeout=_ALONG_TIMEOUT)
+    _cache_invalidate(_EP_CREDS, _EP_INSTANCE_IP)
+    return handle_api_response(response)
+
+@_doc_from(call_get_environments)
+async def acall_get_environments(folder_path: str) -> Dict[str, Any]:
+    return await _acached_get(_EP_ENVIRONMENTS, (("folder_path", folder_path),), ttl=_TTL_ENVIRONMENTS, persist=True)
+
+@_doc_from(call_github_webhook_setup)
+async def acall_github_webhook_setup(folder_path: str) -> Dict[str, Any]:
+    return handle_api_response(await _aget(_EP_WEBHOOK, (("folder_path", folder_path),), timeout=_ALONG_TIMEOUT))
+
 
 if __name__ == '__main__':
     print("Demonstrating API client functions. Ensure the FastAPI server is running at", BASE_URL)
@@ -465,13 +948,13 @@ if __name__ == '__main__':
         print("\n--- Example: call_get_creds (if configured on server) ---")
         # help(call_get_creds) # To see the docstring
         # creds_info = call_get_creds()
-        # print("Get Creds Response:", json.dumps(creds_info, indent=2))
+        # print("Get Creds Response:", orjson.dumps(creds_info, option=orjson.OPT_INDENT_2).decode())
 
         print("\n--- Example: call_analyzer (provide valid paths if testing) ---")
         # help(call_analyzer)
         # analysis = call_analyzer(folder_path="/path/to/your/local_project_for_server_to_access", 
         #                          environment_path="/path/to/python_env_on_server")
-        # print("Analyzer Response:", json.dumps(analysis, indent=2))
+        # print("Analyzer Response:", orjson.dumps(analysis, option=orjson.OPT_INDENT_2).decode())
         
         print("\n--- An example of calling an endpoint that might 'fail' logically ---")
         print("--- For instance, call_analyzer without a required folder_path (if server enforces it) ---")
@@ -483,7 +966,7 @@ if __name__ == '__main__':
         # except APIClientError as e:
         #     print(f"Caught expected APIClientError for missing folder_path: {e}")
         #     if e.response_data:
-        #         print("Error Response Data:", json.dumps(e.response_data, indent=2))
+        #         print("Error Response Data:", orjson.dumps(e.response_data, option=orjson.OPT_INDENT_2).decode())
 
         print(f"\n--- Help for {call_analyzer.__name__} ---")
         help(call_analyzer)
@@ -492,7 +975,7 @@ if __name__ == '__main__':
     except APIClientError as e:
         print(f"\nAPI Client Error during example execution: {e}")
         if e.response_data:
-            print("Error Response Data:", json.dumps(e.response_data, indent=2))
+            print("Error Response Data:", orjson.dumps(e.response_data, option=orjson.OPT_INDENT_2).decode())
         if e.status_code:
             print("Status Code:", e.status_code)
     except Exception as e: # Catch any other unexpected errors during the example run